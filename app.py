@@ -1,153 +1,442 @@
 from __future__ import annotations
 import os
+import functools
 import hashlib
+import itertools
 import json
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from time import time
 from uuid import uuid4
 from urllib.parse import urlparse
 import sqlite3
+import threading
+import orjson
 import requests
-from flask import Flask, jsonify, request, send_from_directory
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, Response, jsonify, request, send_from_directory
+
+# A proof is valid when sha256(f"{last_proof}{proof}") starts with this many
+# hex zeros. As bytes, that is exactly digest < _DIFFICULTY_TARGET: one
+# C-level comparison on the raw digest, no hex string or int conversion.
+DIFFICULTY_HEX_ZEROS = 4
+_DIFFICULTY_TARGET = (1 << (256 - 4 * DIFFICULTY_HEX_ZEROS)).to_bytes(32, "big")
+
+try:
+    from pow_kernel import make_kernels
+except ImportError:  # numba not installed: use the pure-Python paths below
+    find_nonce = proofs_valid = None
+else:
+    # Difficulty is baked into the compiled kernels (they support 1-8 zeros)
+    find_nonce, proofs_valid = make_kernels(DIFFICULTY_HEX_ZEROS)
+
+# The kernels work on int64; other proofs take the pure-Python path
+_KERNEL_MAX_PROOF = 2**63 - 1
 
 # ---------------- SQLite Persistence ----------------
 # Use DB_PATH env var if provided (e.g., set DB_PATH=/data/blockchain.db on Render with a Disk)
 DB_PATH = os.getenv("DB_PATH", "blockchain.db")
 
-def db():
-    # check_same_thread=False allows use across Flask worker threads
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+# One connection for the process; check_same_thread=False allows use across
+# Flask worker threads, and _DB_LOCK keeps their transactions from interleaving.
+# isolation_level=None leaves transactions to the explicit BEGIN in save_block.
+_CONN = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+_CONN.execute("PRAGMA journal_mode=WAL")
+_CONN.execute("PRAGMA synchronous=NORMAL")
+_CONN.execute("PRAGMA temp_store=MEMORY")
+_DB_LOCK = threading.Lock()
 
 def init_db():
-    con = db(); cur = con.cursor()
-    cur.execute("""CREATE TABLE IF NOT EXISTS blocks(
+    _CONN.execute("""CREATE TABLE IF NOT EXISTS blocks(
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         idx INTEGER, ts REAL, proof INTEGER, previous_hash TEXT
     )""")
-    cur.execute("""CREATE TABLE IF NOT EXISTS txs(
+    _CONN.execute("""CREATE TABLE IF NOT EXISTS txs(
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         block_idx INTEGER, sender TEXT, recipient TEXT, amount REAL
     )""")
-    con.commit(); con.close()
+    _CONN.execute("CREATE INDEX IF NOT EXISTS txs_block_idx ON txs(block_idx)")
+    # Databases from before merkle roots: add the column (NULL for old blocks)
+    columns = {row[1] for row in _CONN.execute("PRAGMA table_info(blocks)")}
+    if "merkle_root" not in columns:
+        _CONN.execute("ALTER TABLE blocks ADD COLUMN merkle_root TEXT")
 
-def save_block(block: dict):
-    con = db(); cur = con.cursor()
-    cur.execute("INSERT INTO blocks(idx, ts, proof, previous_hash) VALUES(?,?,?,?)",
-                (block["index"], block["timestamp"], block["proof"], block["previous_hash"]))
-    for t in block["transactions"]:
-        cur.execute("INSERT INTO txs(block_idx, sender, recipient, amount) VALUES(?,?,?,?)",
-                    (block["index"], t["sender"], t["recipient"], t["amount"]))
-    con.commit(); con.close()
+def save_block(block: dict, columns: tuple[list, list, list] | None = None):
+    # columns, if given, holds block["transactions"] as (senders, recipients,
+    # amounts) lists, which feed executemany without per-dict lookups
+    if columns is None:
+        txs = block["transactions"]
+        columns = ([t["sender"] for t in txs], [t["recipient"] for t in txs], [t["amount"] for t in txs])
+    # One transaction per block: a single sync instead of one per statement
+    with _DB_LOCK, _CONN:
+        _CONN.execute("BEGIN")
+        _CONN.execute("INSERT INTO blocks(idx, ts, proof, previous_hash, merkle_root) VALUES(?,?,?,?,?)",
+                      (block["index"], block["timestamp"], block["proof"], block["previous_hash"],
+                       block.get("merkle_root")))
+        _CONN.executemany("INSERT INTO txs(block_idx, sender, recipient, amount) VALUES(?,?,?,?)",
+                          zip(itertools.repeat(block["index"]), *columns))
 
 def load_chain_from_db() -> list[dict]:
-    con = db(); cur = con.cursor()
-    cur.execute("SELECT idx, ts, proof, previous_hash FROM blocks ORDER BY idx ASC")
-    rows = cur.fetchall()
+    # Single joined scan; rows arrive grouped by block, transactions in insert order
+    with _DB_LOCK:
+        rows = _CONN.execute("""SELECT b.id, b.idx, b.ts, b.proof, b.previous_hash, b.merkle_root,
+                                       t.id, t.sender, t.recipient, t.amount
+                                FROM blocks b LEFT JOIN txs t ON t.block_idx = b.idx
+                                ORDER BY b.idx ASC, b.id ASC, t.id ASC""").fetchall()
     chain: list[dict] = []
-    for idx, ts, proof, prev in rows:
-        cur.execute("SELECT sender, recipient, amount FROM txs WHERE block_idx=? ORDER BY id ASC", (idx,))
-        txs = [{"sender": s, "recipient": r, "amount": a} for (s, r, a) in cur.fetchall()]
-        chain.append({"index": idx, "timestamp": ts, "transactions": txs, "proof": proof, "previous_hash": prev})
-    con.close()
+    block_id = None
+    for bid, idx, ts, proof, prev, root, tid, s, r, a in rows:
+        if bid != block_id:
+            block_id = bid
+            chain.append({"index": idx, "timestamp": ts, "transactions": [], "proof": proof, "previous_hash": prev})
+            if root is not None:
+                chain[-1]["merkle_root"] = root
+        if tid is not None:
+            chain[-1]["transactions"].append({"sender": s, "recipient": r, "amount": a})
     return chain
 
+# ---------------- Peers ----------------
+# One pooled keep-alive session so consensus rounds reuse connections (and TLS
+# sessions) to neighbours. Only connecting is retried, once, with a short
+# connect timeout: an unreachable peer costs ~4 s, under the 5 s read timeout
+# a single attempt already allowed, since /nodes/resolve holds _CHAIN_LOCK.
+# Reads are not retried; urllib3 already discards pooled sockets the peer has
+# closed before reusing them.
+_PEER_TIMEOUT = (2, 5)  # (connect, read) seconds
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=64, pool_maxsize=64,
+                       max_retries=Retry(total=1, connect=1, read=0, status=0, backoff_factor=0.1))
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+@functools.lru_cache(maxsize=1024)
+def normalize_node(address: str) -> str | None:
+    # "scheme://host[:port]" for a peer address, or None if it isn't usable
+    if "://" not in address:
+        address = f"http://{address}"  # bare "host:port"
+    try:
+        # urlparse raises ValueError for a bad IPv6 literal, .port for a
+        # malformed or out-of-range port
+        parsed = urlparse(address)
+        host, _ = parsed.hostname, parsed.port
+    except ValueError:
+        return None
+    if parsed.scheme not in ("http", "https") or not host:
+        return None
+    if parsed.netloc.endswith(":") or any(c.isspace() for c in parsed.netloc):
+        return None  # "host:" with no port, or whitespace anywhere in the address
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+_LONG_DIGITS = re.compile(rb"\d{19}")
+
+def _reject_constant(name: str):
+    raise ValueError(f"non-finite number {name}")
+
+def fetch_chain(node: str) -> dict | None:
+    try:
+        response = _SESSION.get(f"{node}/chain", timeout=_PEER_TIMEOUT)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    body = response.content
+    try:
+        # orjson turns integers beyond 64 bits into floats, which would change
+        # the block hashes. Such an integer is a run of at least 19 digits;
+        # the rare body with one takes the exact stdlib decoder instead (with
+        # NaN/Infinity refused, as orjson does).
+        if _LONG_DIGITS.search(body):
+            data = json.loads(body, parse_constant=_reject_constant)
+        else:
+            data = orjson.loads(body)
+    except ValueError:  # includes both decoders' JSONDecodeError
+        return None
+    # Anything but a JSON object (e.g. a bare list) is not a chain response
+    return data if isinstance(data, dict) else None
+
 # ---------------- Flask ----------------
 app = Flask(__name__)
 node_identifier = str(uuid4()).replace("-", "")
 
+# ---------------- Block serialization ----------------
+_BLOCK_KEYS = {"index", "timestamp", "transactions", "proof", "previous_hash"}
+_TX_KEYS = {"sender", "recipient", "amount"}
+_encode_str = json.encoder.encode_basestring_ascii
+
+def _json_scalar(value) -> str:
+    kind = type(value)
+    if kind is str:
+        return _encode_str(value)
+    if kind is int:
+        return int.__repr__(value)
+    if kind is float and math.isfinite(value):
+        return float.__repr__(value)
+    raise TypeError(kind)
+
+def transaction_jsons(senders: list, recipients: list, amounts: list) -> list[str]:
+    # json.dumps(tx, sort_keys=True) for each transaction, built from columns;
+    # raises TypeError for values outside the schema
+    return [f'{{"amount": {_json_scalar(a)}, "recipient": {_json_scalar(r)}, "sender": {_json_scalar(s)}}}'
+            for s, r, a in zip(senders, recipients, amounts)]
+
+def _tx_jsons(txs: list) -> list[str]:
+    # transaction_jsons for dict-form transactions, falling back to json.dumps
+    try:
+        if any(type(t) is not dict or t.keys() != _TX_KEYS for t in txs):
+            raise TypeError("transaction keys")
+        return transaction_jsons([t["sender"] for t in txs], [t["recipient"] for t in txs],
+                                 [t["amount"] for t in txs])
+    except TypeError:
+        return [json.dumps(t, sort_keys=True) for t in txs]
+
+def block_json(block: dict) -> str:
+    # Same text as json.dumps(block, sort_keys=True), which the block hash is
+    # defined over, but built directly for the fixed block/transaction schema.
+    # Anything off-schema (extra keys, nested values, bools) takes json.dumps.
+    try:
+        if block.keys() != _BLOCK_KEYS:
+            raise TypeError("block keys")
+        if type(block["transactions"]) is not list:
+            raise TypeError("transactions")
+        txs_json = ", ".join(_tx_jsons(block["transactions"]))
+        return (f'{{"index": {_json_scalar(block["index"])}, "previous_hash": {_json_scalar(block["previous_hash"])}, '
+                f'"proof": {_json_scalar(block["proof"])}, "timestamp": {_json_scalar(block["timestamp"])}, '
+                f'"transactions": [{txs_json}]}}')
+    except (TypeError, AttributeError):
+        return json.dumps(block, sort_keys=True)
+
+_HEADER_KEYS = ("index", "merkle_root", "previous_hash", "proof", "timestamp")
+_MERKLE_BLOCK_KEYS = {*_HEADER_KEYS, "transactions"}
+
+def header_json(block: dict) -> str:
+    # json.dumps(header, sort_keys=True) of the block's header fields only
+    try:
+        return (f'{{"index": {_json_scalar(block["index"])}, "merkle_root": {_json_scalar(block["merkle_root"])}, '
+                f'"previous_hash": {_json_scalar(block["previous_hash"])}, "proof": {_json_scalar(block["proof"])}, '
+                f'"timestamp": {_json_scalar(block["timestamp"])}}}')
+    except TypeError:
+        return json.dumps({k: block[k] for k in _HEADER_KEYS}, sort_keys=True)
+
+def _sha256d(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+def merkle_root(tx_jsons: list[str]) -> bytes:
+    # Bitcoin-style root: leaves are sha256d(tx), a level with an odd number
+    # of nodes pairs its last node with itself; no transactions -> 32 zeros
+    level = [_sha256d(t.encode()) for t in tx_jsons]
+    if not level:
+        return bytes(32)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [_sha256d(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
 # ---------------- Blockchain ----------------
 class Blockchain:
     def __init__(self):
-        self.current_transactions: list[dict] = []
+        # Pending transactions, one list per field (row i across the three is
+        # one transaction); blocks get the dict form only when they are sealed
+        self._tx_senders: list[str] = []
+        self._tx_recipients: list[str] = []
+        self._tx_amounts: list[float] = []
         self.chain: list[dict] = []
+        self.hashes: list[str] = []  # hashes[i] == hash(chain[i]); blocks never change once appended
         self.nodes: set[str] = set()
+        self._node_list: list[str] | None = None  # sorted self.nodes, rebuilt after adds
         # NOTE: do NOT create genesis here. Startup handles load/create.
 
     def new_block(self, proof: int, previous_hash: str | None = None) -> dict:
+        columns = (self._tx_senders, self._tx_recipients, self._tx_amounts)
         block = {
             "index": len(self.chain) + 1,
             "timestamp": time(),
             "transactions": self.current_transactions,
             "proof": proof,
-            "previous_hash": previous_hash or self.hash(self.chain[-1]),
+            # hashes[-1] is the cached hash of the last block (set when it was
+            # appended, or once by replace_chain after a DB load / consensus),
+            # so forging a block never rehashes its predecessor
+            "previous_hash": previous_hash or self.hashes[-1],
         }
-        self.current_transactions = []
+        try:
+            tx_jsons = transaction_jsons(*columns)
+        except TypeError:
+            tx_jsons = _tx_jsons(block["transactions"])
+        block["merkle_root"] = merkle_root(tx_jsons).hex()
+        self._tx_senders, self._tx_recipients, self._tx_amounts = [], [], []
         self.chain.append(block)
-        save_block(block)  # persist every block
+        self.hashes.append(self.hash(block))
+        save_block(block, columns)  # persist every block
         return block
 
     def new_transaction(self, sender: str, recipient: str, amount: float) -> int:
-        self.current_transactions.append({"sender": sender, "recipient": recipient, "amount": amount})
+        # Coerced to the DB column types (TEXT, TEXT, REAL), so a merkle leaf
+        # recomputed from a reloaded chain matches the one hashed here
+        self._tx_senders.append(str(sender))
+        self._tx_recipients.append(str(recipient))
+        self._tx_amounts.append(float(amount))
         return (self.last_block["index"] + 1) if self.chain else 1
 
+    @property
+    def current_transactions(self) -> list[dict]:
+        return [{"sender": s, "recipient": r, "amount": a}
+                for s, r, a in zip(self._tx_senders, self._tx_recipients, self._tx_amounts)]
+
+    def replace_chain(self, chain: list[dict], hashes: list[str] | None = None) -> None:
+        self.chain = chain
+        self.hashes = hashes if hashes is not None else [self.hash(block) for block in chain]
+
     @property
     def last_block(self) -> dict:
         return self.chain[-1]
 
     @staticmethod
     def hash(block: dict) -> str:
-        block_string = json.dumps(block, sort_keys=True).encode()
+        # Blocks with a merkle_root commit to their transactions through it, so
+        # only the small header is hashed. Blocks from before merkle roots keep
+        # hashing their full contents, so existing chains stay valid.
+        if "merkle_root" in block:
+            block_string = header_json(block).encode()
+        else:
+            block_string = block_json(block).encode()
+        # Stays SHA-256 (not BLAKE3): previous_hash links in every persisted
+        # chain and every peer's chain are SHA-256 of this preimage, so there
+        # are no non-consensus hashes here to switch
         return hashlib.sha256(block_string).hexdigest()
 
     def proof_of_work(self, last_proof: int) -> int:
+        # Same guard as valid_proofs: the kernel formats last_proof as an int,
+        # so a float or bool (e.g. from an adopted peer chain) hashes differently
+        if find_nonce is not None and type(last_proof) is int and 0 <= last_proof <= _KERNEL_MAX_PROOF:
+            return int(find_nonce(last_proof))
+        # Same search as looping valid_proof. The constant last_proof prefix is
+        # absorbed once and each attempt clones that state; the proof digits
+        # live in one buffer that is bumped in place instead of re-formatted
+        base = hashlib.sha256(str(last_proof).encode())
+        suffix = bytearray(b"0")
         proof = 0
-        while not self.valid_proof(last_proof, proof):
+        while True:
+            attempt = base.copy()
+            attempt.update(suffix)
+            if attempt.digest() < _DIFFICULTY_TARGET:
+                return proof
             proof += 1
-        return proof
+            i = len(suffix) - 1
+            while i >= 0 and suffix[i] == 57:  # "9" carries into the next digit
+                suffix[i] = 48
+                i -= 1
+            if i < 0:
+                suffix.insert(0, 49)  # all nines: one more digit, "1" then zeros
+            else:
+                suffix[i] += 1
 
     @staticmethod
     def valid_proof(last_proof: int, proof: int) -> bool:
         guess = f"{last_proof}{proof}".encode()
-        guess_hash = hashlib.sha256(guess).hexdigest()
-        return guess_hash.startswith("0000")
+        return hashlib.sha256(guess).digest() < _DIFFICULTY_TARGET
 
     # (Consensus & nodes)
-    def register_node(self, address: str) -> None:
-        parsed = urlparse(address)
-        if parsed.scheme and parsed.netloc:
-            self.nodes.add(f"{parsed.scheme}://{parsed.netloc}")
-        else:
-            self.nodes.add(f"http://{address}")
+    def register_node(self, address: str) -> bool:
+        # False (and nothing added) if address is not a usable peer URL
+        node = normalize_node(address) if isinstance(address, str) else None
+        if node is None:
+            return False
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self._node_list = None
+        return True
+
+    @property
+    def node_list(self) -> list[str]:
+        if self._node_list is None:
+            self._node_list = sorted(self.nodes)
+        return self._node_list
 
     def valid_chain(self, chain: list[dict]) -> bool:
+        return self.chain_hashes(chain) is not None
+
+    def chain_hashes(self, chain: list[dict]) -> list[str] | None:
+        # Hash of every block in chain, or None if the chain is not valid.
+        # Peer chains are untrusted JSON: a block missing fields or holding
+        # the wrong types makes the chain invalid rather than raising.
         if not chain:
-            return False
-        last_block = chain[0]
-        for block in chain[1:]:
-            if block["previous_hash"] != self.hash(last_block):
-                return False
-            if not self.valid_proof(last_block["proof"], block["proof"]):
-                return False
-            last_block = block
-        return True
+            return None
+        try:
+            return self._chain_hashes(chain)
+        except (KeyError, TypeError, AttributeError):
+            return None
+
+    def _chain_hashes(self, chain: list[dict]) -> list[str] | None:
+        # Per-block hashing and proof checks are independent of each other;
+        # only the previous_hash links have to be compared in order.
+        # The local chain's hashes are already cached.
+        if chain is self.chain:
+            hashes = self.hashes
+        else:
+            hashes = [self.hash(block) for block in chain]
+            # The header hash only covers the header and merkle_root: a block
+            # may hold nothing else, and its root must match its transactions
+            for block in chain:
+                if "merkle_root" not in block:
+                    continue
+                if block.keys() != _MERKLE_BLOCK_KEYS or type(block["transactions"]) is not list:
+                    return None
+                if block["merkle_root"] != merkle_root(_tx_jsons(block["transactions"])).hex():
+                    return None
+        for block, last_hash in zip(chain[1:], hashes):
+            if block["previous_hash"] != last_hash:
+                return None
+        if not self.valid_proofs([block["proof"] for block in chain]):
+            return None
+        return hashes
+
+    @classmethod
+    def valid_proofs(cls, proofs: list) -> bool:
+        # Checks valid_proof(proofs[i], proofs[i + 1]) for every consecutive pair
+        if proofs_valid is not None and all(
+                type(p) is int and 0 <= p <= _KERNEL_MAX_PROOF for p in proofs):
+            return proofs_valid(proofs[:-1], proofs[1:])
+        return all(cls.valid_proof(a, b) for a, b in zip(proofs, proofs[1:]))
 
     def resolve_conflicts(self) -> bool:
-        neighbors = self.nodes
+        neighbors = list(self.nodes)
         new_chain: list[dict] | None = None
+        new_hashes: list[str] | None = None
         max_length = len(self.chain)
-        for node in neighbors:
-            try:
-                response = requests.get(f"{node}/chain", timeout=5)
-            except requests.RequestException:
-                continue
-            if response.status_code != 200:
-                continue
-            data = response.json()
-            length = data.get("length")
-            chain = data.get("chain")
-            if length and chain and length > max_length and self.valid_chain(chain):
-                max_length = length
-                new_chain = chain
+        if not neighbors:
+            return False
+        # Fetch all neighbours at once; validate each chain as its response lands
+        with ThreadPoolExecutor(max_workers=min(32, len(neighbors))) as executor:
+            futures = [executor.submit(fetch_chain, node) for node in neighbors]
+            for future in as_completed(futures):
+                data = future.result()
+                if data is None:
+                    continue
+                # The peer's "length" is not trusted; only the chain itself counts
+                chain = data.get("chain")
+                if not (isinstance(chain, list) and len(chain) > max_length):
+                    continue
+                hashes = self.chain_hashes(chain)
+                if hashes is not None:
+                    max_length = len(chain)
+                    new_chain = chain
+                    new_hashes = hashes
         if new_chain:
-            self.chain = new_chain
+            self.replace_chain(new_chain, new_hashes)
             return True
         return False
 
 # -------- Startup: init DB, load or create genesis ------
 init_db()
 blockchain = Blockchain()
+# Serializes mining and chain replacement between request threads. Reads such
+# as /chain don't take it, and find_nonce releases the GIL while it searches.
+_CHAIN_LOCK = threading.Lock()
 _db_chain = load_chain_from_db()
 if _db_chain:
-    blockchain.chain = _db_chain
+    blockchain.replace_chain(_db_chain)
 else:
     blockchain.new_block(proof=100, previous_hash="1")  # create & persist genesis once
 
@@ -162,12 +451,21 @@ def new_transaction_route():
     required = ["sender", "recipient", "amount"]
     if not all(k in values for k in required):
         return jsonify({"error": "Missing values. Required: sender, recipient, amount"}), 400
+    try:
+        amount = float(values["amount"])
+    except (TypeError, ValueError):
+        amount = math.nan
+    # NaN and +-inf have no JSON form: /chain would send them as null and the
+    # block's merkle root would no longer match for peers
+    if not math.isfinite(amount):
+        return jsonify({"error": "amount must be a finite number"}), 400
 
-    blockchain.new_transaction(values["sender"], values["recipient"], float(values["amount"]))
-    last_proof = blockchain.last_block["proof"]
-    proof = blockchain.proof_of_work(last_proof)
-    blockchain.new_transaction(sender="0", recipient=node_identifier, amount=1)  # mining reward
-    block = blockchain.new_block(proof)
+    with _CHAIN_LOCK:
+        blockchain.new_transaction(values["sender"], values["recipient"], amount)
+        last_proof = blockchain.last_block["proof"]
+        proof = blockchain.proof_of_work(last_proof)
+        blockchain.new_transaction(sender="0", recipient=node_identifier, amount=1)  # mining reward
+        block = blockchain.new_block(proof)
 
     return jsonify({
         "message": "Transaction stored and block mined",
@@ -180,10 +478,11 @@ def new_transaction_route():
 
 @app.route("/mine", methods=["GET"])
 def mine_route():
-    last_proof = blockchain.last_block["proof"]
-    proof = blockchain.proof_of_work(last_proof)
-    blockchain.new_transaction(sender="0", recipient=node_identifier, amount=1)
-    block = blockchain.new_block(proof)
+    with _CHAIN_LOCK:
+        last_proof = blockchain.last_block["proof"]
+        proof = blockchain.proof_of_work(last_proof)
+        blockchain.new_transaction(sender="0", recipient=node_identifier, amount=1)
+        block = blockchain.new_block(proof)
     return jsonify({
         "message": "New Block Forged",
         "index": block["index"],
@@ -193,9 +492,30 @@ def mine_route():
         "miner": node_identifier
     }), 200
 
+def _block_bytes(block: dict) -> bytes:
+    try:
+        return orjson.dumps(block, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:  # e.g. ints beyond 64 bits in an adopted chain
+        return json.dumps(block, sort_keys=True, separators=(",", ":")).encode()
+
+_CHAIN_CHUNK_BLOCKS = 128
+
 @app.route("/chain", methods=["GET"])
 def full_chain():
-    return jsonify({"chain": blockchain.chain, "length": len(blockchain.chain)}), 200
+    # Peers pull this on every consensus round, so it is streamed a few blocks
+    # at a time (orjson per block) instead of being built as one big body.
+    # Same fields and key order as jsonify would produce.
+    chain = blockchain.chain
+    length = len(chain)  # blocks mined while streaming are not included
+
+    def generate():
+        yield b'{"chain":['
+        for start in range(0, length, _CHAIN_CHUNK_BLOCKS):
+            chunk = b",".join(_block_bytes(block) for block in chain[start:min(start + _CHAIN_CHUNK_BLOCKS, length)])
+            yield chunk if start == 0 else b"," + chunk
+        yield b'],"length":%d}' % length
+
+    return Response(generate(), mimetype="application/json"), 200
 
 @app.route("/nodes/register", methods=["POST"])
 def register_nodes():
@@ -203,19 +523,25 @@ def register_nodes():
     nodes = values.get("nodes")
     if nodes is None or not isinstance(nodes, list) or not nodes:
         return jsonify({"error": "Please supply a non-empty list of node URLs in 'nodes'."}), 400
-    for node in nodes:
-        blockchain.register_node(node)
-    return jsonify({"message": "New nodes have been added", "total_nodes": list(blockchain.nodes)}), 201
+    rejected = [node for node in nodes if not blockchain.register_node(node)]
+    if len(rejected) == len(nodes):
+        return jsonify({"error": "None of the supplied node URLs are valid http(s) peer addresses.",
+                        "rejected": rejected}), 400
+    return jsonify({"message": "New nodes have been added", "total_nodes": blockchain.node_list,
+                    "rejected": rejected}), 201
 
 @app.route("/nodes/resolve", methods=["GET"])
 def consensus():
-    replaced = blockchain.resolve_conflicts()
+    with _CHAIN_LOCK:
+        replaced = blockchain.resolve_conflicts()
     if replaced:
         return jsonify({"message": "Our chain was replaced", "new_chain": blockchain.chain}), 200
     else:
         return jsonify({"message": "Our chain is authoritative", "chain": blockchain.chain}), 200
 
 # ---------------- Run ----------------
+# Production: `gunicorn app:app` (settings in gunicorn.conf.py). This block is
+# the local development server only.
 if __name__ == "__main__":
     # Use Render's assigned port if present
     port = int(os.environ.get("PORT", 5000))
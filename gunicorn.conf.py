@@ -0,0 +1,17 @@
+# Loaded automatically by `gunicorn app:app` from the project directory.
+import os
+
+# Use Render's assigned port if present
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# The chain and pending transactions live in process memory, so there must be
+# exactly one worker process; more would each mine their own diverging chain
+# into the same database. Threads give the concurrency instead: find_nonce
+# releases the GIL, so /chain and the other routes keep being served while a
+# block is mined.
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Pure-Python mining (no numba) can take a while on slow hosts
+timeout = 120
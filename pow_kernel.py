@@ -0,0 +1,183 @@
+"""Numba-compiled proof-of-work search.
+
+Equivalent to looping ``Blockchain.valid_proof`` over increasing nonces, but the
+message ``f"{last_proof}{proof}"`` is built in a reused byte buffer and hashed
+with an in-kernel SHA-256 compression, so no Python objects are created per
+attempt. The guess is at most 40 ASCII digits, so it always fits in a single
+64-byte SHA-256 block.
+"""
+from __future__ import annotations
+import numpy as np
+from numba import int64, njit, prange
+
+_MASK = 0xFFFFFFFF
+
+# SHA-256 round constants and initial hash value (FIPS 180-4, 4.2.2 / 5.3.3)
+_K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.uint32)
+_H0 = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.uint32)
+
+@njit(inline="always")
+def _rotr(x, n):
+    return ((x >> n) | (x << (32 - n))) & _MASK
+
+@njit(inline="always")
+def _write_decimal(buf, pos, n) -> int:
+    # Writes the ASCII digits of n at buf[pos:] and returns the end offset
+    digits = 1
+    m = n // 10
+    while m:
+        digits += 1
+        m //= 10
+    end = pos + digits
+    i = end - 1
+    while True:
+        buf[i] = 48 + n % 10
+        n //= 10
+        if n == 0:
+            break
+        i -= 1
+    return end
+
+@njit(inline="always")
+def _round(a, b, c, d, e, f, g, h, kw):
+    # One SHA-256 round; kw is K[t] + W[t]. Returns the new (a, e)
+    S1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+    ch = (e & f) ^ (~e & g & _MASK)
+    t1 = h + S1 + ch + kw
+    S0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+    maj = (a & b) ^ (a & c) ^ (b & c)
+    return (t1 + S0 + maj) & _MASK, (d + t1) & _MASK
+
+@njit(inline="always")
+def _proof_word(buf, w, last_proof, proof) -> int:
+    # First output word of sha256(f"{last_proof}{proof}") for a single guess
+    end = _write_decimal(buf, _write_decimal(buf, 0, last_proof), proof)
+    buf[end] = 0x80
+    for i in range(end + 1, 56):
+        buf[i] = 0
+    bits = end * 8
+    buf[62] = (bits >> 8) & 0xFF
+    buf[63] = bits & 0xFF
+    for t in range(16):
+        j = 4 * t
+        w[t] = (np.int64(buf[j]) << 24) | (np.int64(buf[j + 1]) << 16) | (np.int64(buf[j + 2]) << 8) | np.int64(buf[j + 3])
+    for t in range(16, 64):
+        x = w[t - 15]
+        y = w[t - 2]
+        s0 = _rotr(x, 7) ^ _rotr(x, 18) ^ (x >> 3)
+        s1 = _rotr(y, 17) ^ _rotr(y, 19) ^ (y >> 10)
+        w[t] = (w[t - 16] + s0 + w[t - 7] + s1) & _MASK
+    a = np.int64(_H0[0]); b = np.int64(_H0[1]); c = np.int64(_H0[2]); d = np.int64(_H0[3])
+    e = np.int64(_H0[4]); f = np.int64(_H0[5]); g = np.int64(_H0[6]); h = np.int64(_H0[7])
+    for t in range(64):
+        na, ne = _round(a, b, c, d, e, f, g, h, np.int64(_K[t]) + w[t])
+        h = g; g = f; f = e; e = ne
+        d = c; c = b; b = a; a = na
+    return (np.int64(_H0[0]) + a) & _MASK
+
+# Nonces are searched a decade at a time: proofs 10*n .. 10*n+9 share every
+# byte but the last, so they run as ten independent lanes over one message
+_LANES = 10
+
+def make_kernels(difficulty_hex_zeros: int):
+    """Build (find_nonce, proofs_valid) for a fixed difficulty.
+
+    A guess passes when its SHA-256 hex digest starts with difficulty_hex_zeros
+    zeros (1-8), i.e. the top 4*N bits of the first output word are clear. The
+    shift is a closure constant, so Numba compiles it into the kernels; each
+    difficulty gets its own cached build.
+    """
+    if not 1 <= difficulty_hex_zeros <= 8:
+        raise ValueError("difficulty_hex_zeros must be between 1 and 8")
+    top_shift = 32 - 4 * difficulty_hex_zeros
+
+    # int64 rather than uint64: mixing uint64 with integer literals promotes to float
+    @njit(int64(int64), cache=True, nogil=True, boundscheck=False)
+    def find_nonce(last_proof):
+        """Smallest proof whose sha256(f"{last_proof}{proof}") has the required hex zeros."""
+        buf = np.zeros(64, np.uint8)
+        w = np.empty((64, _LANES), np.int64)
+        st = np.empty((8, _LANES), np.int64)
+        prefix = _write_decimal(buf, 0, last_proof)
+        decade = 0
+        while True:
+            # Message is prefix + decade digits (none for decade 0) + lane digit
+            end = prefix if decade == 0 else _write_decimal(buf, prefix, decade)
+            buf[end] = 0
+            buf[end + 1] = 0x80
+            for i in range(end + 2, 56):
+                buf[i] = 0
+            bits = (end + 1) * 8
+            buf[62] = (bits >> 8) & 0xFF
+            buf[63] = bits & 0xFF
+            q = end >> 2
+            shift = 8 * (3 - (end & 3))
+            # Words and rounds before word q are identical in every lane: do them once
+            a = np.int64(_H0[0]); b = np.int64(_H0[1]); c = np.int64(_H0[2]); d = np.int64(_H0[3])
+            e = np.int64(_H0[4]); f = np.int64(_H0[5]); g = np.int64(_H0[6]); h = np.int64(_H0[7])
+            for t in range(16):
+                j = 4 * t
+                word = (np.int64(buf[j]) << 24) | (np.int64(buf[j + 1]) << 16) | (np.int64(buf[j + 2]) << 8) | np.int64(buf[j + 3])
+                if t < q:
+                    na, ne = _round(a, b, c, d, e, f, g, h, np.int64(_K[t]) + word)
+                    h = g; g = f; f = e; e = ne
+                    d = c; c = b; b = a; a = na
+                for l in range(_LANES):
+                    w[t, l] = word
+            for l in range(_LANES):
+                w[q, l] |= (48 + l) << shift
+                st[0, l] = a; st[1, l] = b; st[2, l] = c; st[3, l] = d
+                st[4, l] = e; st[5, l] = f; st[6, l] = g; st[7, l] = h
+            for t in range(16, 64):
+                for l in range(_LANES):
+                    x = w[t - 15, l]
+                    y = w[t - 2, l]
+                    s0 = _rotr(x, 7) ^ _rotr(x, 18) ^ (x >> 3)
+                    s1 = _rotr(y, 17) ^ _rotr(y, 19) ^ (y >> 10)
+                    w[t, l] = (w[t - 16, l] + s0 + w[t - 7, l] + s1) & _MASK
+            # Lane-inner loops over contiguous rows let LLVM vectorize across nonces
+            for t in range(q, 64):
+                k = np.int64(_K[t])
+                for l in range(_LANES):
+                    na, ne = _round(st[0, l], st[1, l], st[2, l], st[3, l],
+                                    st[4, l], st[5, l], st[6, l], st[7, l], k + w[t, l])
+                    st[7, l] = st[6, l]; st[6, l] = st[5, l]; st[5, l] = st[4, l]; st[4, l] = ne
+                    st[3, l] = st[2, l]; st[2, l] = st[1, l]; st[1, l] = st[0, l]; st[0, l] = na
+            for l in range(_LANES):
+                if ((np.int64(_H0[0]) + st[0, l]) & _MASK) >> top_shift == 0:
+                    return 10 * decade + l
+            decade += 1
+
+    @njit(int64(int64[:], int64[:]), cache=True, nogil=True, parallel=True, boundscheck=False)
+    def _count_bad_proofs(last_proofs, proofs):
+        bad = 0
+        for i in prange(len(proofs)):
+            buf = np.zeros(64, np.uint8)
+            w = np.empty(64, np.int64)
+            if (_proof_word(buf, w, last_proofs[i], proofs[i]) >> top_shift) != 0:
+                bad += 1
+        return bad
+
+    def proofs_valid(last_proofs, proofs) -> bool:
+        """True if every (last_proofs[i], proofs[i]) pair is a valid proof.
+
+        Pairs are independent, so they are checked in parallel across cores.
+        All proofs must be non-negative and fit in int64.
+        """
+        return _count_bad_proofs(np.asarray(last_proofs, np.int64), np.asarray(proofs, np.int64)) == 0
+
+    # Both kernels have explicit signatures, so @njit already compiled them (or
+    # loaded them from the on-disk cache) above and the first /mine is fast. No
+    # warm-up call: at high difficulty find_nonce(100) would itself mine a block.
+    return find_nonce, proofs_valid
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# app.py opens (and, if empty, seeds) DB_PATH at import time; keep tests off
+# the real blockchain.db
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
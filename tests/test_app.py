@@ -0,0 +1,144 @@
+import hashlib
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+pytest.importorskip("flask")
+import app
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+def peer_view(client):
+    # What another node sees: the /chain body, decoded the way fetch_chain does
+    data = orjson.loads(client.get("/chain").data)
+    return app.Blockchain().chain_hashes(data["chain"])
+
+@pytest.mark.parametrize("amount", ["nan", "inf", "-inf", "1e400", "abc", None])
+def test_non_finite_amount_is_rejected(client, amount):
+    before = len(app.blockchain.chain)
+    response = client.post("/transactions/new", json={"sender": "a", "recipient": "b", "amount": amount})
+    assert response.status_code == 400
+    assert len(app.blockchain.chain) == before
+    response = client.post("/transactions/new", json={"sender": "a", "recipient": "b", "amount": 5})
+    assert response.status_code == 201
+    assert peer_view(client) == app.blockchain.hashes
+
+@pytest.mark.parametrize("address, expected", [
+    ("localhost:5000", "http://localhost:5000"),
+    ("http://127.0.0.1:5001/", "http://127.0.0.1:5001"),
+    ("https://node.example.com/chain", "https://node.example.com"),
+    ("http://[::1]:5000", "http://[::1]:5000"),
+    ("http://[::1", None),
+    ("http://", None),
+    ("http://http://", None),
+    ("http://host:", None),
+    ("", None),
+    ("  ", None),
+    ("http://a b", None),
+    ("a b:5000", None),
+    ("localhost:99999", None),
+    ("localhost:port", None),
+    ("ftp://node.example.com", None),
+])
+def test_normalize_node(address, expected):
+    assert app.normalize_node(address) == expected
+
+def test_register_nodes_rejects_unparseable_urls(client):
+    response = client.post("/nodes/register", json={"nodes": ["http://[::1", "http://"]})
+    assert response.status_code == 400
+    assert response.get_json()["rejected"] == ["http://[::1", "http://"]
+
+@pytest.mark.parametrize("last_proof", [35293, 35293.0, True, -1, 2**64])
+def test_proof_of_work_matches_valid_proof(last_proof):
+    proof = app.Blockchain().proof_of_work(last_proof)
+    assert app.Blockchain.valid_proof(last_proof, proof)
+
+def fake_peer(monkeypatch, body: bytes):
+    response = SimpleNamespace(status_code=200, content=body)
+    monkeypatch.setattr(app._SESSION, "get", lambda url, timeout: response)
+
+def test_fetch_chain_keeps_integers_beyond_64_bits(monkeypatch):
+    fake_peer(monkeypatch, b'{"chain":[{"proof":18446744073709551616,"timestamp":1.5}],"length":1}')
+    data = app.fetch_chain("http://peer")
+    assert data["chain"][0]["proof"] == 2**64 and type(data["chain"][0]["proof"]) is int
+    assert data["chain"][0]["timestamp"] == 1.5
+
+@pytest.mark.parametrize("body", [b'{"chain":[],"length":NaN}', b'{"chain":[18446744073709551616],"x":Infinity}',
+                                  b"[1,2]", b"not json"])
+def test_fetch_chain_rejects_unusable_bodies(monkeypatch, body):
+    fake_peer(monkeypatch, body)
+    assert app.fetch_chain("http://peer") is None
+
+def test_resolve_conflicts_uses_the_chain_not_its_length(client, monkeypatch):
+    client.get("/mine")
+    client.get("/mine")
+    peer_chain = list(app.blockchain.chain)
+    node = app.Blockchain()
+    node.replace_chain(peer_chain[:-1])
+    node.register_node("http://peer")
+    responses = [{"length": 10**9, "chain": peer_chain[:1]}, {"length": 10**9, "chain": "x"}, {"length": 10**9}]
+    for data in responses:
+        monkeypatch.setattr(app, "fetch_chain", lambda _, data=data: data)
+        assert not node.resolve_conflicts()
+    monkeypatch.setattr(app, "fetch_chain", lambda _: {"length": "9", "chain": peer_chain})
+    assert node.resolve_conflicts()
+    assert node.chain == peer_chain and node.hashes == app.blockchain.hashes
+
+def test_mined_chain_validates_on_another_node(client):
+    client.post("/transactions/new", json={"sender": "a", "recipient": "b", "amount": 2.5})
+    assert "merkle_root" in app.blockchain.last_block
+    assert peer_view(client) == app.blockchain.hashes
+
+@pytest.mark.parametrize("tamper", [
+    lambda block: block["transactions"][0].update(amount=1000.0),
+    lambda block: block["transactions"].append({"sender": "0", "recipient": "x", "amount": 1.0}),
+    lambda block: block.update(note="not covered by any hash"),
+    lambda block: block.update(merkle_root="00" * 32),
+])
+def test_tampered_block_is_rejected(client, tamper):
+    client.post("/transactions/new", json={"sender": "a", "recipient": "b", "amount": 2.5})
+    chain = orjson.loads(client.get("/chain").data)["chain"]
+    tamper(chain[-1])
+    assert app.Blockchain().chain_hashes(chain) is None
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    # A database written before merkle roots: the old schema and block format
+    conn = sqlite3.connect(tmp_path / "legacy.db", check_same_thread=False, isolation_level=None)
+    conn.execute("CREATE TABLE blocks(id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 "idx INTEGER, ts REAL, proof INTEGER, previous_hash TEXT)")
+    conn.execute("CREATE TABLE txs(id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 "block_idx INTEGER, sender TEXT, recipient TEXT, amount REAL)")
+    genesis = {"index": 1, "timestamp": 1700000000.25, "transactions": [], "proof": 100, "previous_hash": "1"}
+    block = {"index": 2, "timestamp": 1700000060.5, "proof": app.Blockchain().proof_of_work(100),
+             "transactions": [{"sender": "a", "recipient": "b", "amount": 3.0},
+                              {"sender": "0", "recipient": "miner", "amount": 1.0}],
+             "previous_hash": hashlib.sha256(json.dumps(genesis, sort_keys=True).encode()).hexdigest()}
+    for b in (genesis, block):
+        conn.execute("INSERT INTO blocks(idx, ts, proof, previous_hash) VALUES(?,?,?,?)",
+                     (b["index"], b["timestamp"], b["proof"], b["previous_hash"]))
+        conn.executemany("INSERT INTO txs(block_idx, sender, recipient, amount) VALUES(?,?,?,?)",
+                         [(b["index"], t["sender"], t["recipient"], t["amount"]) for t in b["transactions"]])
+    monkeypatch.setattr(app, "_CONN", conn)
+    app.init_db()
+    return [genesis, block]
+
+def test_legacy_chain_loads_and_validates(legacy_db):
+    chain = app.load_chain_from_db()
+    assert chain == legacy_db
+    assert app.Blockchain().chain_hashes(chain) is not None
+
+def test_merkle_root_round_trips_through_db(legacy_db):
+    node = app.Blockchain()
+    node.replace_chain(app.load_chain_from_db())
+    node.new_transaction("a", "b", 4)
+    node.new_block(node.proof_of_work(node.last_block["proof"]))
+    chain = app.load_chain_from_db()
+    assert "merkle_root" not in chain[1] and chain[2]["merkle_root"] == node.last_block["merkle_root"]
+    assert chain == node.chain
+    assert app.Blockchain().chain_hashes(chain) == node.hashes
@@ -0,0 +1,58 @@
+import functools
+import hashlib
+import random
+
+import pytest
+
+pytest.importorskip("numba")
+from pow_kernel import make_kernels
+
+def hex_zeros(last_proof, proof):
+    digest = hashlib.sha256(f"{last_proof}{proof}".encode()).hexdigest()
+    return len(digest) - len(digest.lstrip("0"))
+
+@functools.lru_cache(maxsize=None)
+def reference_nonce(last_proof, zeros):
+    # The plain hashlib search; digest < target <=> hex digest has that many leading zeros
+    target = (1 << (256 - 4 * zeros)).to_bytes(32, "big")
+    proof = 0
+    while hashlib.sha256(f"{last_proof}{proof}".encode()).digest() >= target:
+        proof += 1
+    return proof
+
+# 1-19 digit prefixes put the proof digits (and the lane digit) at every byte
+# offset within a SHA-256 word, and on both sides of each word boundary
+LAST_PROOFS = sorted({0, 7, 100, 35293, 2**63 - 1}
+                     | {10**k - 1 for k in range(1, 19)} | {10**k for k in range(1, 19)})
+
+@pytest.mark.parametrize("zeros", [1, 2, 3, 4])
+def test_find_nonce_matches_hashlib(zeros):
+    find_nonce, _ = make_kernels(zeros)
+    for last_proof in LAST_PROOFS:
+        assert find_nonce(last_proof) == reference_nonce(last_proof, zeros), last_proof
+
+def test_find_nonce_matches_hashlib_difficulty_5():
+    find_nonce, _ = make_kernels(5)
+    for last_proof in (100, 10**9):
+        assert find_nonce(last_proof) == reference_nonce(last_proof, 5)
+
+@pytest.mark.parametrize("zeros", range(1, 9))
+def test_proofs_valid_matches_hashlib(zeros):
+    _, proofs_valid = make_kernels(zeros)
+    rng = random.Random(zeros)
+    pairs = [(rng.randrange(10**rng.randrange(1, 19)), rng.randrange(10**rng.randrange(1, 19)))
+             for _ in range(2000)]
+    # Pairs with 1-7 leading hex zeros exercise both sides of every difficulty
+    pairs += [(last_proof, reference_nonce(last_proof, k)) for last_proof in (100, 35293) for k in range(1, 5)]
+    pairs += [(100, reference_nonce(100, 5))]
+    pairs += [(1, 8719932), (3, 5152636), (7, 10622976)]  # 6, 6 and 7 hex zeros
+    for last_proof, proof in pairs:
+        expected = hex_zeros(last_proof, proof) >= zeros
+        assert proofs_valid([last_proof], [proof]) == expected, (last_proof, proof)
+    assert proofs_valid([p for p, _ in pairs], [q for _, q in pairs]) == all(
+        hex_zeros(p, q) >= zeros for p, q in pairs)
+
+def test_make_kernels_rejects_unsupported_difficulty():
+    for zeros in (0, 9):
+        with pytest.raises(ValueError):
+            make_kernels(zeros)
@@ -0,0 +1,58 @@
+import json
+import random
+
+import pytest
+
+pytest.importorskip("flask")
+import app
+
+STRINGS = ["", "0", "aditya", "294271208ba24ed48c036669509f5efd", 'quote " slash \\ tab \t',
+           "newline \n", "\x00\x1f\x7f", "naïve", "€", "😀", "\ud800"]
+NUMBERS = [0, 1, -1, 2**63, 2**70, 0.0, -0.0, 1.0, 0.1, 6000.0, 1e16, 1e-7, 5e-324, 1.7976931348623157e308,
+           1762404391.0789099]
+
+def random_scalar(rng):
+    return rng.choice(STRINGS) if rng.random() < 0.5 else rng.choice(NUMBERS)
+
+def random_block(rng):
+    block = {
+        "index": rng.choice(NUMBERS),
+        "timestamp": rng.choice(NUMBERS),
+        "transactions": [{"sender": random_scalar(rng), "recipient": random_scalar(rng),
+                          "amount": random_scalar(rng)} for _ in range(rng.randrange(5))],
+        "proof": rng.choice(NUMBERS),
+        "previous_hash": random_scalar(rng),
+    }
+    return block
+
+def test_block_json_matches_json_dumps():
+    rng = random.Random(0)
+    for _ in range(5000):
+        block = random_block(rng)
+        assert app.block_json(block) == json.dumps(block, sort_keys=True)
+
+def test_header_json_matches_json_dumps():
+    rng = random.Random(1)
+    for _ in range(5000):
+        block = dict(random_block(rng), merkle_root=random_scalar(rng))
+        header = {k: block[k] for k in ("index", "merkle_root", "previous_hash", "proof", "timestamp")}
+        assert app.header_json(block) == json.dumps(header, sort_keys=True)
+
+@pytest.mark.parametrize("change", [
+    {"extra": 1},
+    {"proof": True},
+    {"timestamp": float("nan")},
+    {"timestamp": float("inf")},
+    {"previous_hash": None},
+    {"transactions": {"sender": "a"}},
+    {"transactions": [{"sender": "a", "recipient": "b", "amount": 1, "memo": "x"}]},
+    {"transactions": [{"sender": "a", "recipient": "b"}]},
+    {"transactions": [["a", "b", 1]]},
+    {"transactions": [{"sender": ["a"], "recipient": "b", "amount": 1}]},
+])
+def test_off_schema_blocks_fall_back_to_json_dumps(change):
+    block = dict(random_block(random.Random(2)), **change)
+    assert app.block_json(block) == json.dumps(block, sort_keys=True)
+    block["merkle_root"] = "00" * 32
+    header = {k: block[k] for k in ("index", "merkle_root", "previous_hash", "proof", "timestamp")}
+    assert app.header_json(block) == json.dumps(header, sort_keys=True)